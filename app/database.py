@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
 DB_PATH = Path("media_monitor.db")
 
@@ -10,17 +13,51 @@ DB_PATH = Path("media_monitor.db")
 class Database:
     def __init__(self, db_path: Path = DB_PATH) -> None:
         self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
         self._init_db()
 
-    def connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    @contextmanager
+    def cursor(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            yield self._conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            if self._conn.in_transaction:
+                yield self._conn
+                return
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
 
     def _init_db(self) -> None:
-        with self.connect() as conn:
+        with self.cursor() as conn:
+            fts_row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'articles_fts'").fetchone()
+            if fts_row is not None and "trigram" not in fts_row["sql"]:
+                conn.execute("DROP TABLE articles_fts")
+                fts_row = None
             conn.executescript(
                 """
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA cache_size=-64000;
+                PRAGMA mmap_size=268435456;
+                PRAGMA cache_spill=OFF;
+                PRAGMA threads=4;
+
                 CREATE TABLE IF NOT EXISTS searches (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT NOT NULL,
@@ -58,19 +95,77 @@ class Database:
                     summary TEXT,
                     fetched_at TEXT NOT NULL
                 );
+
+                CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                    title,
+                    summary,
+                    content='articles_cache',
+                    content_rowid='id',
+                    tokenize='trigram'
+                );
+
+                CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles_cache BEGIN
+                    INSERT INTO articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles_cache BEGIN
+                    INSERT INTO articles_fts(articles_fts, rowid, title, summary)
+                    VALUES ('delete', old.id, old.title, old.summary);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles_cache BEGIN
+                    INSERT INTO articles_fts(articles_fts, rowid, title, summary)
+                    VALUES ('delete', old.id, old.title, old.summary);
+                    INSERT INTO articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+                END;
                 """
             )
+            if fts_row is None:
+                conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+            added_hour = self._ensure_column(conn, "reports", "send_hour", "INTEGER")
+            added_minute = self._ensure_column(conn, "reports", "send_minute", "INTEGER")
+            if added_hour or added_minute:
+                conn.execute(
+                    """
+                    UPDATE reports SET
+                        send_hour = CAST(substr(send_time, 1, instr(send_time, ':') - 1) AS INTEGER),
+                        send_minute = CAST(substr(send_time, instr(send_time, ':') + 1) AS INTEGER)
+                    WHERE instr(send_time, ':') > 0
+                    """
+                )
+            if self._ensure_column(conn, "articles_cache", "published_ts", "INTEGER"):
+                conn.execute("UPDATE articles_cache SET published_ts = CAST(strftime('%s', published_at) AS INTEGER)")
+            conn.executescript(
+                """
+                DROP INDEX IF EXISTS idx_articles_published;
+                DROP INDEX IF EXISTS idx_articles_pub_cover;
+                CREATE INDEX IF NOT EXISTS idx_articles_published_ts ON articles_cache(published_ts DESC);
+                CREATE INDEX IF NOT EXISTS idx_articles_ts_cover
+                    ON articles_cache(published_ts DESC, title, source, url, summary);
+                """
+            )
+
+    @staticmethod
+    def _ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> bool:
+        columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column in columns:
+            return False
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+        return True
 
     def get_setting(self, key: str, default: str = "") -> str:
-        with self.connect() as conn:
+        with self.cursor() as conn:
             row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
             return row["value"] if row else default
 
     def set_setting(self, key: str, value: str) -> None:
-        with self.connect() as conn:
-            conn.execute(
+        self.set_settings({key: value})
+
+    def set_settings(self, pairs: dict[str, str]) -> None:
+        with self.transaction() as conn:
+            conn.executemany(
                 "INSERT INTO settings(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
-                (key, value),
+                pairs.items(),
             )
 
     def get_json_setting(self, key: str, default_value: list[dict] | dict) -> list[dict] | dict:
@@ -1,12 +1,32 @@
 from __future__ import annotations
 
+import logging
 import smtplib
+import threading
 from email.message import EmailMessage
 
+logger = logging.getLogger(__name__)
+
 
 class Mailer:
     def __init__(self, db) -> None:
         self.db = db
+        self._lock = threading.RLock()
+        self._smtp: smtplib.SMTP_SSL | None = None
+        self._session_depth = 0
+
+    def __enter__(self) -> Mailer:
+        self._lock.acquire()
+        self._session_depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            self._session_depth -= 1
+            if self._session_depth == 0:
+                self._close()
+        finally:
+            self._lock.release()
 
     def smtp_settings(self) -> dict:
         return {
@@ -26,6 +46,40 @@ class Mailer:
         msg.set_content("Rapporten finnes i HTML-format.")
         msg.add_alternative(html, subtype="html")
 
-        with smtplib.SMTP_SSL(cfg["host"], cfg["port"], timeout=20) as smtp:
+        with self._lock:
+            if not self._session_depth:
+                with self._connect(cfg) as smtp:
+                    smtp.send_message(msg)
+                return
+            self._ensure_session(cfg).send_message(msg)
+
+    @staticmethod
+    def _connect(cfg: dict) -> smtplib.SMTP_SSL:
+        smtp = smtplib.SMTP_SSL(cfg["host"], cfg["port"], timeout=20)
+        try:
             smtp.login(cfg["user"], cfg["password"])
-            smtp.send_message(msg)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    def _ensure_session(self, cfg: dict) -> smtplib.SMTP_SSL:
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            logger.info("SMTP-sesjon brutt, kobler til på nytt")
+            self._close()
+        self._smtp = self._connect(cfg)
+        return self._smtp
+
+    def _close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
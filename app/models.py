@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Article:
     title: str
     source: str
@@ -19,7 +19,7 @@ class Article:
         return f"fallback:{self.title.strip().lower()}|{date_part}|{self.source.strip().lower()}"
 
 
-@dataclass
+@dataclass(slots=True)
 class SavedSearch:
     id: int | None
     name: str
@@ -30,7 +30,7 @@ class SavedSearch:
     last_x_days: int | None
 
 
-@dataclass
+@dataclass(slots=True)
 class ReportConfig:
     id: int | None
     name: str
@@ -41,3 +41,5 @@ class ReportConfig:
     enabled: int
     last_run_at: str | None
     last_status: str | None
+    send_hour: int | None = None
+    send_minute: int | None = None
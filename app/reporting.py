@@ -1,40 +1,43 @@
 from __future__ import annotations
 
 from datetime import datetime
+from html import escape as _e
 from pathlib import Path
 
 from app.models import Article, SavedSearch
 
+_STYLE_BLOCK = (
+    "<style>"
+    "body{font-family:Segoe UI,Arial,sans-serif;color:#222}"
+    "table{border-collapse:collapse;width:100%}"
+    "th,td{border:1px solid #d0d0d0;padding:8px;text-align:left;vertical-align:top}"
+    "th{background:#f3f3f3}"
+    "a{color:#004b95}"
+    "</style>"
+)
+
+_PAGE_HEAD = "<html><head><meta charset='utf-8'>" + _STYLE_BLOCK + "</head><body>\n"
+_PAGE_FMT = (
+    "<h2>{0}</h2>\n"
+    "<p><b>Periode:</b> {1}</p>\n"
+    "<h3>Søkekriterier</h3><ul>{2}</ul>\n"
+    "<h3>Treff</h3><table><thead><tr><th>Dato</th><th>Kilde</th><th>Tittel</th><th>Link</th></tr></thead><tbody>\n"
+    "{3}\n"
+    "</tbody></table></body></html>"
+).format
+_ROW_FMT = "<tr><td>{0}<td>{1}<td>{2}<td><a href='{3}'>{3}</a></tr>".format
+_SEARCH_FMT = "<li><b>{0}</b>: inkluder [{1}] / ekskluder [{2}]</li>".format
+_NO_HITS_ROW = "<tr><td colspan='4'>Ingen treff.</tr>"
+
 
 def render_report_html(report_name: str, period_label: str, search_infos: list[SavedSearch], articles: list[Article]) -> str:
     rows = "\n".join(
-        f"<tr><td>{a.published_at.strftime('%Y-%m-%d %H:%M')}</td><td>{a.source}</td><td>{a.title}</td><td><a href='{a.url}'>{a.url}</a></td></tr>"
-        for a in articles
+        [_ROW_FMT(a.published_at.strftime("%Y-%m-%d %H:%M"), _e(a.source), _e(a.title), _e(a.url)) for a in articles]
     )
-    if not rows:
-        rows = "<tr><td colspan='4'>Ingen treff.</td></tr>"
-
     search_list = "".join(
-        f"<li><b>{s.name}</b>: inkluder [{s.include_terms}] / ekskluder [{s.exclude_terms or '-'}]</li>"
-        for s in search_infos
+        [_SEARCH_FMT(_e(s.name), _e(s.include_terms), _e(s.exclude_terms or "-")) for s in search_infos]
     )
-
-    return f"""
-<html><head><meta charset='utf-8'><style>
-body {{ font-family: Segoe UI, Arial, sans-serif; color:#222; }}
-table {{ border-collapse: collapse; width:100%; }}
-th, td {{ border:1px solid #d0d0d0; padding:8px; text-align:left; vertical-align:top; }}
-th {{ background:#f3f3f3; }}
-a {{ color:#004b95; }}
-</style></head><body>
-<h2>{report_name}</h2>
-<p><b>Periode:</b> {period_label}</p>
-<h3>Søkekriterier</h3>
-<ul>{search_list}</ul>
-<h3>Treff</h3>
-<table><thead><tr><th>Dato</th><th>Kilde</th><th>Tittel</th><th>Link</th></tr></thead><tbody>{rows}</tbody></table>
-</body></html>
-"""
+    return _PAGE_HEAD + _PAGE_FMT(_e(report_name), _e(period_label), search_list, rows or _NO_HITS_ROW)
 
 
 def export_report_html(file_path: Path, html: str) -> None:
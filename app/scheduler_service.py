@@ -3,13 +3,21 @@ from __future__ import annotations
 import logging
 from datetime import datetime, timedelta
 
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
 
-from app.models import SavedSearch
+from app.models import ReportConfig, SavedSearch
 from app.reporting import render_report_html
 
 logger = logging.getLogger(__name__)
 
+CRON_FIELDS_BY_FREQUENCY = {
+    "Daglig": {},
+    "Ukentlig": {"day_of_week": "mon"},
+    "Månedlig": {"day": "1"},
+}
+
 
 class SchedulerService:
     def __init__(self, report_service, search_service, search_engine, mailer) -> None:
@@ -20,46 +28,88 @@ class SchedulerService:
         self.scheduler = BackgroundScheduler()
 
     def start(self) -> None:
-        self.scheduler.add_job(self.run_due_reports, "interval", minutes=1, id="due_reports", replace_existing=True)
+        self.reschedule_reports()
         self.scheduler.start()
 
     def stop(self) -> None:
         if self.scheduler.running:
-            self.scheduler.shutdown(wait=False)
+            self.scheduler.shutdown(wait=True)
 
-    def run_due_reports(self) -> None:
-        now = datetime.now()
-        for report in self.report_service.list_reports():
-            if not report.enabled:
+    def reschedule_reports(self) -> None:
+        slots = {self._slot(r) for r in self.report_service.list_reports()}
+        slots.discard(None)
+        wanted = {self._job_id(*slot): slot for slot in slots}
+        for job in self.scheduler.get_jobs():
+            if not job.id.startswith("slot-"):
                 continue
-            if not self._is_due(report.frequency, report.send_time, now):
-                continue
-            try:
-                search_ids = [int(s) for s in report.search_ids_csv.split(",") if s.strip().isdigit()]
-                saved_searches = [s for s in self.search_service.list_searches() if s.id in search_ids]
-                articles = self._collect_articles(saved_searches)
-                period = self._period_label(report.frequency, now)
-                html = render_report_html(report.name, period, saved_searches, articles)
-                self.mailer.send_html(report.recipient_email, f"Medierapport: {report.name}", html)
-                self.report_service.update_report_status(report.id, now.isoformat(timespec="seconds"), "OK")
-            except Exception as exc:
-                logger.exception("Feil i scheduler for rapport %s", report.name)
-                self.report_service.update_report_status(report.id, now.isoformat(timespec="seconds"), f"FEIL: {exc}")
-
-    def _collect_articles(self, searches: list[SavedSearch]):
+            if wanted.pop(job.id, None) is None:
+                try:
+                    self.scheduler.remove_job(job.id)
+                except JobLookupError:
+                    pass
+        for job_id, (frequency, hour, minute) in wanted.items():
+            self.scheduler.add_job(
+                self.run_slot,
+                CronTrigger(hour=hour, minute=minute, **CRON_FIELDS_BY_FREQUENCY[frequency]),
+                args=[frequency, hour, minute],
+                id=job_id,
+                replace_existing=True,
+                coalesce=True,
+                misfire_grace_time=300,
+            )
+
+    def run_slot(self, frequency: str, hour: int, minute: int) -> None:
+        slot = (frequency, hour, minute)
+        self.run_reports([r for r in self.report_service.list_reports() if self._slot(r) == slot])
+
+    def run_all_reports(self) -> None:
+        self.run_reports([r for r in self.report_service.list_reports() if r.enabled])
+
+    def run_reports(self, reports: list[ReportConfig]) -> None:
+        if not reports:
+            return
+        now = datetime.now()
+        search_ids_by_report = {r.id: self._search_ids(r) for r in reports}
+        all_ids = sorted({sid for ids in search_ids_by_report.values() for sid in ids})
+        searches_by_id = {s.id: s for s in self.search_service.get_searches_by_ids(all_ids)}
+        self.search_engine.refresh()
+        search_cache: dict[tuple, list] = {}
+        ran_at = now.isoformat(timespec="seconds")
+        statuses: list[tuple[int, str, str]] = []
+        try:
+            with self.mailer:
+                for report in reports:
+                    try:
+                        saved_searches = [searches_by_id[sid] for sid in search_ids_by_report[report.id] if sid in searches_by_id]
+                        articles = self._collect_articles(saved_searches, search_cache)
+                        period = self._period_label(report.frequency, now)
+                        html = render_report_html(report.name, period, saved_searches, articles)
+                        self.mailer.send_html(report.recipient_email, f"Medierapport: {report.name}", html)
+                        statuses.append((report.id, ran_at, "OK"))
+                    except Exception as exc:
+                        logger.exception("Feil i scheduler for rapport %s", report.name)
+                        statuses.append((report.id, ran_at, f"FEIL: {exc}"))
+        finally:
+            self.report_service.update_report_statuses(statuses)
+
+    def _collect_articles(self, searches: list[SavedSearch], search_cache: dict[tuple, list]):
         all_articles = []
         seen = set()
         for s in searches:
-            date_from = datetime.fromisoformat(s.date_from) if s.date_from else None
-            date_to = datetime.fromisoformat(s.date_to) if s.date_to else None
-            results = self.search_engine.run_search(
-                s.include_terms,
-                s.exclude_terms,
-                date_from,
-                date_to,
-                s.last_x_days,
-                refresh_sources=True,
-            )
+            cache_key = (s.include_terms, s.exclude_terms, s.date_from, s.date_to, s.last_x_days)
+            results = search_cache.get(cache_key)
+            if results is None:
+                date_from = datetime.fromisoformat(s.date_from) if s.date_from else None
+                date_to = datetime.fromisoformat(s.date_to) if s.date_to else None
+                results = self.search_engine.run_search(
+                    s.include_terms,
+                    s.exclude_terms,
+                    date_from,
+                    date_to,
+                    s.last_x_days,
+                    refresh_sources=False,
+                )
+                search_cache[cache_key] = results
             for article in results:
                 key = article.dedup_key()
                 if key not in seen:
@@ -69,17 +119,20 @@ class SchedulerService:
         return all_articles
 
     @staticmethod
-    def _is_due(frequency: str, send_time: str, now: datetime) -> bool:
-        hh, mm = [int(x) for x in send_time.split(":")]
-        if now.hour != hh or now.minute != mm:
-            return False
-        if frequency == "Daglig":
-            return True
-        if frequency == "Ukentlig":
-            return now.weekday() == 0
-        if frequency == "Månedlig":
-            return now.day == 1
-        return False
+    def _search_ids(report: ReportConfig) -> list[int]:
+        return [int(s) for s in report.search_ids_csv.split(",") if s.strip().isdigit()]
+
+    @staticmethod
+    def _slot(report: ReportConfig) -> tuple[str, int, int] | None:
+        if not report.enabled or report.frequency not in CRON_FIELDS_BY_FREQUENCY:
+            return None
+        if report.send_hour is None or report.send_minute is None:
+            return None
+        return report.frequency, report.send_hour, report.send_minute
+
+    @staticmethod
+    def _job_id(frequency: str, hour: int, minute: int) -> str:
+        return f"slot-{frequency}-{hour:02d}:{minute:02d}"
 
     @staticmethod
     def _period_label(frequency: str, now: datetime) -> str:
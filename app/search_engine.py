@@ -2,22 +2,76 @@ from __future__ import annotations
 
 import logging
 import re
+import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from app.models import Article
 
 logger = logging.getLogger(__name__)
-PHRASE_RE = re.compile(r'"([^"]+)"')
+SECONDS_PER_DAY = 86400
+TERM_RE = re.compile(r'"([^"]+)"|([^\s,"]+)')
+MIN_TRIGRAM_TERM_LEN = 3
+
+_RANGE_SQL = (
+    "SELECT title, source, published_ts, url, summary FROM articles_cache "
+    "WHERE published_ts BETWEEN ? AND ? ORDER BY published_ts DESC"
+)
+_MATCH_SQL = (
+    "SELECT c.title, c.source, c.published_ts, c.url, c.summary "
+    "FROM articles_fts f JOIN articles_cache c ON c.id = f.rowid "
+    "WHERE articles_fts MATCH ? AND c.published_ts BETWEEN ? AND ? ORDER BY c.published_ts DESC"
+)
+_EXCLUDE_SQL = (
+    "SELECT title, source, published_ts, url, summary FROM articles_cache "
+    "WHERE id NOT IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?) "
+    "AND published_ts BETWEEN ? AND ? ORDER BY published_ts DESC"
+)
 
 
 def parse_terms(text: str) -> list[str]:
-    text = text.strip()
-    if not text:
-        return []
-    phrases = [p.strip().lower() for p in PHRASE_RE.findall(text) if p.strip()]
-    remaining = PHRASE_RE.sub(" ", text)
-    words = [w.strip().lower() for w in re.split(r"[\s,]+", remaining) if w.strip()]
-    return phrases + words
+    terms = []
+    for phrase, word in TERM_RE.findall(text):
+        term = phrase.strip() if phrase else word
+        if term:
+            terms.append(term)
+    return [t.lower() for t in terms]
+
+
+def _fts_term(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_fts_query(include_terms: list[str], exclude_terms: list[str]) -> str:
+    include = " AND ".join(_fts_term(t) for t in include_terms)
+    exclude = " OR ".join(_fts_term(t) for t in exclude_terms)
+    if include and exclude:
+        return f"({include}) NOT ({exclude})"
+    return include or exclude
+
+
+@lru_cache(maxsize=256)
+def compile_search(
+    include_terms_text: str, exclude_terms_text: str
+) -> tuple[str, str | None, tuple[str, ...], tuple[str, ...]]:
+    include_terms = list(dict.fromkeys(parse_terms(include_terms_text)))
+    exclude_terms = list(dict.fromkeys(parse_terms(exclude_terms_text)))
+    fts_include = [t for t in include_terms if len(t) >= MIN_TRIGRAM_TERM_LEN]
+    fts_exclude = [t for t in exclude_terms if len(t) >= MIN_TRIGRAM_TERM_LEN]
+    short_include = tuple(t for t in include_terms if len(t) < MIN_TRIGRAM_TERM_LEN)
+    short_exclude = tuple(t for t in exclude_terms if len(t) < MIN_TRIGRAM_TERM_LEN)
+    if fts_include:
+        return _MATCH_SQL, build_fts_query(fts_include, fts_exclude), short_include, short_exclude
+    if fts_exclude:
+        return _EXCLUDE_SQL, " OR ".join(_fts_term(t) for t in fts_exclude), short_include, short_exclude
+    return _RANGE_SQL, None, short_include, short_exclude
+
+
+def _matches_short_terms(title: str, summary: str | None, include: tuple[str, ...], exclude: tuple[str, ...]) -> bool:
+    haystack = f"{title} {summary or ''}".lower()
+    if include and not all(term in haystack for term in include):
+        return False
+    return not any(term in haystack for term in exclude)
 
 
 class SearchEngine:
@@ -35,65 +89,72 @@ class SearchEngine:
         refresh_sources: bool = True,
     ) -> list[Article]:
         if refresh_sources:
-            self._fetch_and_cache()
-
-        include_terms = parse_terms(include_terms_text)
-        exclude_terms = parse_terms(exclude_terms_text)
-        from_dt, to_dt = self._resolve_range(date_from, date_to, last_x_days)
-
-        with self.db.connect() as conn:
-            rows = conn.execute(
-                "SELECT title, source, published_at, url, summary FROM articles_cache WHERE published_at BETWEEN ? AND ? ORDER BY published_at DESC",
-                (from_dt.isoformat(), to_dt.isoformat()),
-            ).fetchall()
-
-        results: list[Article] = []
-        for row in rows:
-            article = Article(
-                title=row["title"],
-                source=row["source"],
-                published_at=datetime.fromisoformat(row["published_at"]),
-                url=row["url"] or "",
-                summary=row["summary"] or "",
-            )
-            if self._matches(article, include_terms, exclude_terms):
-                results.append(article)
-        return results
+            self.refresh()
 
-    def _fetch_and_cache(self) -> None:
-        fetched = self.source_manager.fetch_articles()
-        now = datetime.now(timezone.utc).isoformat()
-        with self.db.connect() as conn:
-            for article in fetched:
-                try:
-                    conn.execute(
-                        """
-                        INSERT INTO articles_cache(dedup_key, title, source, published_at, url, summary, fetched_at)
-                        VALUES(?, ?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(dedup_key) DO NOTHING
-                        """,
-                        (
-                            article.dedup_key(),
-                            article.title,
-                            article.source,
-                            article.published_at.isoformat(),
-                            article.url,
-                            article.summary,
-                            now,
-                        ),
+        sql, fts_query, short_include, short_exclude = compile_search(include_terms_text, exclude_terms_text)
+        if last_x_days:
+            now_ts = int(time.time())
+            params: tuple = (now_ts - last_x_days * SECONDS_PER_DAY, now_ts)
+        else:
+            from_dt, to_dt = self._resolve_range(date_from, date_to)
+            params = (int(from_dt.timestamp()), int(to_dt.timestamp()))
+        if fts_query is not None:
+            params = (fts_query, *params)
+
+        fromtimestamp = datetime.fromtimestamp
+        utc = timezone.utc
+        check_short_terms = bool(short_include or short_exclude)
+        articles: list[Article] = []
+        with self.db.cursor() as conn:
+            for title, source, published_ts, url, summary in conn.execute(sql, params):
+                if check_short_terms and not _matches_short_terms(title, summary, short_include, short_exclude):
+                    continue
+                articles.append(
+                    Article(
+                        title=title,
+                        source=source,
+                        published_at=fromtimestamp(published_ts, utc),
+                        url=url or "",
+                        summary=summary or "",
                     )
-                except Exception as exc:
-                    logger.exception("Feil ved caching av artikkel: %s", exc)
+                )
+        return articles
+
+    def refresh(self) -> None:
+        fetched, validators = self.source_manager.fetch_articles()
+        if not fetched and not validators:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (
+                a.dedup_key(),
+                a.title,
+                a.source,
+                a.published_at.isoformat(),
+                int(a.published_at.timestamp()),
+                a.url,
+                a.summary,
+                now,
+            )
+            for a in fetched
+        ]
+        try:
+            with self.db.transaction() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO articles_cache(dedup_key, title, source, published_at, published_ts, url, summary, fetched_at)
+                    VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(dedup_key) DO NOTHING
+                    """,
+                    rows,
+                )
+                self.source_manager.save_validators(validators)
+        except Exception as exc:
+            logger.exception("Feil ved caching av %d artikler: %s", len(rows), exc)
 
     @staticmethod
-    def _resolve_range(
-        date_from: datetime | None,
-        date_to: datetime | None,
-        last_x_days: int | None,
-    ) -> tuple[datetime, datetime]:
+    def _resolve_range(date_from: datetime | None, date_to: datetime | None) -> tuple[datetime, datetime]:
         now = datetime.now(timezone.utc)
-        if last_x_days:
-            return now - timedelta(days=last_x_days), now
         start = date_from or (now - timedelta(days=1))
         end = date_to or now
         if start.tzinfo is None:
@@ -101,12 +162,3 @@ class SearchEngine:
         if end.tzinfo is None:
             end = end.replace(tzinfo=timezone.utc)
         return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
-
-    @staticmethod
-    def _matches(article: Article, include_terms: list[str], exclude_terms: list[str]) -> bool:
-        haystack = f"{article.title} {article.summary}".lower()
-        if include_terms and not all(term in haystack for term in include_terms):
-            return False
-        if any(term in haystack for term in exclude_terms):
-            return False
-        return True
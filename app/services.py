@@ -3,17 +3,35 @@ from __future__ import annotations
 from app.models import ReportConfig, SavedSearch
 
 
+def parse_send_time(send_time: str) -> tuple[int, int]:
+    hh, mm = [int(x) for x in send_time.split(":")]
+    if not (0 <= hh < 24 and 0 <= mm < 60):
+        raise ValueError(f"Ugyldig sendetid: {send_time}")
+    return hh, mm
+
+
 class SearchService:
     def __init__(self, db) -> None:
         self.db = db
+        self._searches_cache: list[SavedSearch] | None = None
 
     def list_searches(self) -> list[SavedSearch]:
-        with self.db.connect() as conn:
-            rows = conn.execute("SELECT * FROM searches ORDER BY id DESC").fetchall()
+        if self._searches_cache is None:
+            with self.db.cursor() as conn:
+                rows = conn.execute("SELECT * FROM searches ORDER BY id DESC").fetchall()
+            self._searches_cache = [SavedSearch(**dict(row)) for row in rows]
+        return list(self._searches_cache)
+
+    def get_searches_by_ids(self, ids: list[int]) -> list[SavedSearch]:
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        with self.db.cursor() as conn:
+            rows = conn.execute(f"SELECT * FROM searches WHERE id IN ({placeholders})", tuple(ids)).fetchall()
         return [SavedSearch(**dict(row)) for row in rows]
 
     def save_search(self, item: SavedSearch) -> None:
-        with self.db.connect() as conn:
+        with self.db.transaction() as conn:
             if item.id:
                 conn.execute(
                     """UPDATE searches SET name=?, include_terms=?, exclude_terms=?, date_from=?, date_to=?, last_x_days=? WHERE id=?""",
@@ -24,10 +42,12 @@ class SearchService:
                     """INSERT INTO searches(name, include_terms, exclude_terms, date_from, date_to, last_x_days) VALUES(?,?,?,?,?,?)""",
                     (item.name, item.include_terms, item.exclude_terms, item.date_from, item.date_to, item.last_x_days),
                 )
+        self._searches_cache = None
 
     def delete_search(self, search_id: int) -> None:
-        with self.db.connect() as conn:
+        with self.db.transaction() as conn:
             conn.execute("DELETE FROM searches WHERE id=?", (search_id,))
+        self._searches_cache = None
 
 
 class ReportService:
@@ -35,36 +55,56 @@ class ReportService:
         self.db = db
 
     def list_reports(self) -> list[ReportConfig]:
-        with self.db.connect() as conn:
+        with self.db.cursor() as conn:
             rows = conn.execute("SELECT * FROM reports ORDER BY id DESC").fetchall()
         return [ReportConfig(**dict(row)) for row in rows]
 
     def save_report(self, report: ReportConfig) -> None:
-        with self.db.connect() as conn:
+        report.send_hour, report.send_minute = parse_send_time(report.send_time)
+        with self.db.transaction() as conn:
             if report.id:
                 conn.execute(
-                    """UPDATE reports SET name=?, search_ids_csv=?, frequency=?, send_time=?, recipient_email=?, enabled=? WHERE id=?""",
-                    (report.name, report.search_ids_csv, report.frequency, report.send_time, report.recipient_email, report.enabled, report.id),
+                    """UPDATE reports SET name=?, search_ids_csv=?, frequency=?, send_time=?, send_hour=?, send_minute=?, recipient_email=?, enabled=? WHERE id=?""",
+                    (
+                        report.name,
+                        report.search_ids_csv,
+                        report.frequency,
+                        report.send_time,
+                        report.send_hour,
+                        report.send_minute,
+                        report.recipient_email,
+                        report.enabled,
+                        report.id,
+                    ),
                 )
             else:
-                conn.execute(
-                    """INSERT INTO reports(name, search_ids_csv, frequency, send_time, recipient_email, enabled, last_run_at, last_status) VALUES(?,?,?,?,?,?,?,?)""",
+                cur = conn.execute(
+                    """INSERT INTO reports(name, search_ids_csv, frequency, send_time, send_hour, send_minute, recipient_email, enabled, last_run_at, last_status) VALUES(?,?,?,?,?,?,?,?,?,?)""",
                     (
                         report.name,
                         report.search_ids_csv,
                         report.frequency,
                         report.send_time,
+                        report.send_hour,
+                        report.send_minute,
                         report.recipient_email,
                         report.enabled,
                         report.last_run_at,
                         report.last_status,
                     ),
                 )
+                report.id = cur.lastrowid
 
     def delete_report(self, report_id: int) -> None:
-        with self.db.connect() as conn:
+        with self.db.transaction() as conn:
             conn.execute("DELETE FROM reports WHERE id=?", (report_id,))
 
     def update_report_status(self, report_id: int, ran_at: str, status: str) -> None:
-        with self.db.connect() as conn:
-            conn.execute("UPDATE reports SET last_run_at=?, last_status=? WHERE id=?", (ran_at, status, report_id))
+        self.update_report_statuses([(report_id, ran_at, status)])
+
+    def update_report_statuses(self, statuses: list[tuple[int, str, str]]) -> None:
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "UPDATE reports SET last_run_at=?, last_status=? WHERE id=?",
+                [(ran_at, status, report_id) for report_id, ran_at, status in statuses],
+            )
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 
 import feedparser
 import requests
+from requests.adapters import HTTPAdapter
 
 from app.models import Article
 
@@ -16,11 +19,47 @@ DEFAULT_RSS_SOURCES = [
     {"name": "BBC World", "url": "http://feeds.bbci.co.uk/news/world/rss.xml", "enabled": True},
     {"name": "AP Top News", "url": "https://feeds.apnews.com/apf-topnews", "enabled": True},
 ]
+MAX_FETCH_WORKERS = 8
+VALIDATORS_KEY_PREFIX = "feed_validators:"
+
+
+def _extract_date(entry: dict) -> datetime:
+    for field in ("published", "updated"):
+        value = entry.get(field)
+        if value:
+            try:
+                dt = parsedate_to_datetime(value)
+                return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+            except Exception:
+                pass
+    return datetime.now(timezone.utc)
+
+
+def _parse_entries(entries: list, source_name: str) -> list[Article]:
+    articles: list[Article] = []
+    for entry in entries:
+        title = (entry.get("title") or "").strip()
+        if not title:
+            continue
+        articles.append(
+            Article(
+                title=title,
+                source=source_name,
+                published_at=_extract_date(entry),
+                url=(entry.get("link") or "").strip(),
+                summary=(entry.get("summary") or "").strip(),
+            )
+        )
+    return articles
 
 
 class SourceManager:
     def __init__(self, db) -> None:
         self.db = db
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def get_sources(self) -> list[dict]:
         saved = self.db.get_json_setting("rss_sources", DEFAULT_RSS_SOURCES)
@@ -29,46 +68,56 @@ class SourceManager:
     def save_sources(self, sources: list[dict]) -> None:
         self.db.set_json_setting("rss_sources", sources)
 
-    def fetch_articles(self) -> list[Article]:
+    def get_validators(self, url: str) -> dict:
+        saved = self.db.get_json_setting(VALIDATORS_KEY_PREFIX + url, {})
+        if not isinstance(saved, dict):
+            saved = {}
+        return {"etag": saved.get("etag", ""), "last_modified": saved.get("last_modified", "")}
+
+    def save_validators(self, validators: dict[str, dict]) -> None:
+        if validators:
+            self.db.set_settings(
+                {VALIDATORS_KEY_PREFIX + url: json.dumps(v, ensure_ascii=False) for url, v in validators.items()}
+            )
+
+    def fetch_articles(self) -> tuple[list[Article], dict[str, dict]]:
+        sources = [s for s in self.get_sources() if s.get("enabled", True) and s.get("url")]
+        if not sources:
+            return [], {}
+
+        known = {s["url"]: self.get_validators(s["url"]) for s in sources}
         articles: list[Article] = []
-        for source in self.get_sources():
-            if not source.get("enabled", True):
-                continue
-            name = source.get("name", "Ukjent")
-            url = source.get("url", "")
-            if not url:
-                continue
-            try:
-                response = requests.get(url, timeout=20)
-                response.raise_for_status()
-                feed = feedparser.parse(response.content)
-                for entry in feed.entries:
-                    title = (entry.get("title") or "").strip()
-                    summary = (entry.get("summary") or "").strip()
-                    link = (entry.get("link") or "").strip()
-                    published = self._extract_date(entry)
-                    if title:
-                        articles.append(
-                            Article(
-                                title=title,
-                                source=name,
-                                published_at=published,
-                                url=link,
-                                summary=summary,
-                            )
-                        )
-            except Exception as exc:
-                logger.exception("Kunne ikke lese kilde %s (%s): %s", name, url, exc)
-        return articles
-
-    @staticmethod
-    def _extract_date(entry: dict) -> datetime:
-        for field in ("published", "updated"):
-            value = entry.get(field)
-            if value:
+        changed: dict[str, dict] = {}
+        with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(sources))) as pool:
+            futures = {pool.submit(self._download, s["url"], known[s["url"]]): s for s in sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                name = source.get("name", "Ukjent")
+                url = source["url"]
                 try:
-                    dt = parsedate_to_datetime(value)
-                    return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-                except Exception:
-                    pass
-        return datetime.now(timezone.utc)
+                    response = future.result()
+                    if response is None:
+                        continue
+                    feed = feedparser.parse(response.content)
+                    articles.extend(_parse_entries(feed.entries, name))
+                    validators = {
+                        "etag": response.headers.get("ETag", ""),
+                        "last_modified": response.headers.get("Last-Modified", ""),
+                    }
+                    if validators != known[url]:
+                        changed[url] = validators
+                except Exception as exc:
+                    logger.exception("Kunne ikke lese kilde %s (%s): %s", name, url, exc)
+        return articles, changed
+
+    def _download(self, url: str, validators: dict) -> requests.Response | None:
+        headers = {}
+        if validators["etag"]:
+            headers["If-None-Match"] = validators["etag"]
+        if validators["last_modified"]:
+            headers["If-Modified-Since"] = validators["last_modified"]
+        response = self.session.get(url, headers=headers, timeout=20)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        return response
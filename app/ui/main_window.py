@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import webbrowser
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, QThreadPool
 from PySide6.QtWidgets import (
     QAbstractItemView,
     QApplication,
@@ -16,6 +17,7 @@ from PySide6.QtWidgets import (
     QGridLayout,
     QGroupBox,
     QHBoxLayout,
+    QHeaderView,
     QLabel,
     QLineEdit,
     QListWidget,
@@ -24,16 +26,57 @@ from PySide6.QtWidgets import (
     QMessageBox,
     QPushButton,
     QSpinBox,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QTabWidget,
     QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
-from app.models import ReportConfig, SavedSearch
+from app.models import Article, ReportConfig, SavedSearch
 from app.reporting import default_report_filename, export_report_html, render_report_html
+from app.ui.workers import ReportsWorker, SearchWorker, TestEmailWorker
+
+
+RESULT_COLUMN_WIDTHS = (130, 160, 520, 320)
+
+
+@lru_cache(maxsize=4096)
+def _format_row(published_at: datetime, source: str, title: str, url: str) -> tuple[str, str, str, str]:
+    return published_at.strftime("%Y-%m-%d %H:%M"), source, title, url
+
+
+class ArticleTableModel(QAbstractTableModel):
+    HEADERS = ["Dato", "Kilde", "Tittel", "Link"]
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._rows: list[Article] = []
+
+    def set_rows(self, rows: list[Article]) -> None:
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def article_at(self, row: int) -> Article:
+        return self._rows[row]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        art = self._rows[index.row()]
+        return _format_row(art.published_at, art.source, art.title, art.url)[index.column()]
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):  # noqa: N802
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
 
 
 class MainWindow(QMainWindow):
@@ -49,10 +92,8 @@ class MainWindow(QMainWindow):
 
         self.setWindowTitle("Medieovervåkning")
         self.resize(1200, 760)
+        self._tab_loaded = {0: True, 1: False, 2: False, 3: False}
         self._build_ui()
-        self._load_searches()
-        self._load_reports()
-        self._load_settings()
 
     def _build_ui(self) -> None:
         tabs = QTabWidget()
@@ -60,8 +101,20 @@ class MainWindow(QMainWindow):
         tabs.addTab(self._build_auto_search_tab(), "Automatiske søk")
         tabs.addTab(self._build_reports_tab(), "Rapporter")
         tabs.addTab(self._build_settings_tab(), "Innstillinger")
+        tabs.currentChanged.connect(self._on_tab_changed)
         self.setCentralWidget(tabs)
 
+    def _on_tab_changed(self, index: int) -> None:
+        if self._tab_loaded.get(index, True):
+            return
+        self._tab_loaded[index] = True
+        if index in (1, 2):
+            self._load_searches()
+        if index == 2:
+            self._load_reports()
+        if index == 3:
+            self._load_settings()
+
     def _build_search_tab(self) -> QWidget:
         page = QWidget()
         layout = QVBoxLayout(page)
@@ -82,10 +135,10 @@ class MainWindow(QMainWindow):
         self.last_days.setRange(0, 365)
         self.last_days.setValue(7)
 
-        run_btn = QPushButton("Kjør søk")
-        run_btn.clicked.connect(self.run_manual_search)
-        refresh_btn = QPushButton("Oppdater kilder nå")
-        refresh_btn.clicked.connect(lambda: self.run_manual_search(force_refresh=True))
+        self.run_search_btn = QPushButton("Kjør søk")
+        self.run_search_btn.clicked.connect(self.run_manual_search)
+        self.refresh_btn = QPushButton("Oppdater kilder nå")
+        self.refresh_btn.clicked.connect(lambda: self.run_manual_search(force_refresh=True))
 
         form.addWidget(QLabel("Inkluder"), 0, 0)
         form.addWidget(self.include_input, 0, 1)
@@ -99,15 +152,27 @@ class MainWindow(QMainWindow):
         form.addWidget(self.last_days, 4, 1)
 
         buttons = QHBoxLayout()
-        buttons.addWidget(run_btn)
-        buttons.addWidget(refresh_btn)
+        buttons.addWidget(self.run_search_btn)
+        buttons.addWidget(self.refresh_btn)
         form.addLayout(buttons, 5, 1)
 
-        self.results_table = QTableWidget(0, 4)
-        self.results_table.setHorizontalHeaderLabels(["Dato", "Kilde", "Tittel", "Link"])
+        self._articles_model = ArticleTableModel(self)
+        self._articles_proxy = QSortFilterProxyModel(self)
+        self._articles_proxy.setSourceModel(self._articles_model)
+        self.results_table = QTableView()
+        self.results_table.setModel(self._articles_proxy)
         self.results_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.results_table.setSortingEnabled(True)
-        self.results_table.cellDoubleClicked.connect(self.open_result_link)
+        self.results_table.doubleClicked.connect(self.open_result_link)
+        self.results_table.setWordWrap(False)
+        self.results_table.setTextElideMode(Qt.ElideRight)
+        vertical_header = self.results_table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(self.results_table.fontMetrics().height() + 6)
+        horizontal_header = self.results_table.horizontalHeader()
+        horizontal_header.setSectionResizeMode(QHeaderView.Interactive)
+        for column, width in enumerate(RESULT_COLUMN_WIDTHS):
+            self.results_table.setColumnWidth(column, width)
 
         export_btn = QPushButton("Eksporter HTML-rapport")
         export_btn.clicked.connect(self.export_current_results)
@@ -180,8 +245,8 @@ class MainWindow(QMainWindow):
 
         save_btn = QPushButton("Lagre rapport")
         save_btn.clicked.connect(self.save_report)
-        send_test_btn = QPushButton("Send test-epost")
-        send_test_btn.clicked.connect(self.send_test_email)
+        self.send_test_btn = QPushButton("Send test-epost")
+        self.send_test_btn.clicked.connect(self.send_test_email)
 
         form.addRow("Navn", self.report_name)
         form.addRow("Frekvens", self.report_frequency)
@@ -189,20 +254,20 @@ class MainWindow(QMainWindow):
         form.addRow("Mottaker e-post", self.report_email)
         form.addRow("Knyttede søk", self.report_searches)
         form.addRow("", self.report_enabled)
-        form.addRow(save_btn, send_test_btn)
+        form.addRow(save_btn, self.send_test_btn)
 
         right = QVBoxLayout()
         self.reports_list = QListWidget()
         self.reports_list.itemClicked.connect(self.load_report_to_form)
         self.scheduler_status = QLabel("Scheduler kjører i bakgrunnen.")
-        run_now_btn = QPushButton("Kjør rapport-jobber nå")
-        run_now_btn.clicked.connect(self.run_reports_now)
+        self.run_now_btn = QPushButton("Kjør rapport-jobber nå")
+        self.run_now_btn.clicked.connect(self.run_reports_now)
         del_btn = QPushButton("Slett valgt rapport")
         del_btn.clicked.connect(self.delete_selected_report)
         right.addWidget(QLabel("Lagrede rapporter"))
         right.addWidget(self.reports_list)
         right.addWidget(self.scheduler_status)
-        right.addWidget(run_now_btn)
+        right.addWidget(self.run_now_btn)
         right.addWidget(del_btn)
 
         layout.addWidget(form_box, 2)
@@ -245,32 +310,47 @@ class MainWindow(QMainWindow):
         return page
 
     def run_manual_search(self, force_refresh: bool = True) -> None:
-        try:
-            include = self.include_input.toPlainText()
-            exclude = self.exclude_input.toPlainText()
-            fx = self.last_days.value() or None
-            from_dt = datetime.combine(self.from_date.date().toPython(), datetime.min.time()).replace(tzinfo=timezone.utc)
-            to_dt = datetime.combine(self.to_date.date().toPython(), datetime.max.time()).replace(tzinfo=timezone.utc)
-            results = self.search_engine.run_search(include, exclude, from_dt, to_dt, fx, refresh_sources=force_refresh)
-            self._fill_results_table(results)
-            self._current_result_articles = results
-        except Exception as exc:
-            QMessageBox.critical(self, "Feil", str(exc))
+        include = self.include_input.toPlainText()
+        exclude = self.exclude_input.toPlainText()
+        fx = self.last_days.value() or None
+        from_dt = datetime.combine(self.from_date.date().toPython(), datetime.min.time()).replace(tzinfo=timezone.utc)
+        to_dt = datetime.combine(self.to_date.date().toPython(), datetime.max.time()).replace(tzinfo=timezone.utc)
+        worker = SearchWorker(self.search_engine, include, exclude, from_dt, to_dt, fx, force_refresh)
+        worker.signals.finished.connect(self._on_search_done)
+        worker.signals.failed.connect(self._on_search_failed)
+        self._search_worker = worker
+        self._set_search_running(True)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_search_done(self, results) -> None:
+        self._set_search_running(False)
+        self._fill_results_table(results)
+        self._current_result_articles = results
+
+    def _on_search_failed(self, message: str) -> None:
+        self._set_search_running(False)
+        QMessageBox.critical(self, "Feil", message)
+
+    def _set_search_running(self, running: bool) -> None:
+        self.run_search_btn.setEnabled(not running)
+        self.refresh_btn.setEnabled(not running)
+        if not running:
+            self._search_worker = None
 
     def _fill_results_table(self, articles) -> None:
-        self.results_table.setRowCount(0)
-        for art in articles:
-            row = self.results_table.rowCount()
-            self.results_table.insertRow(row)
-            self.results_table.setItem(row, 0, QTableWidgetItem(art.published_at.strftime("%Y-%m-%d %H:%M")))
-            self.results_table.setItem(row, 1, QTableWidgetItem(art.source))
-            self.results_table.setItem(row, 2, QTableWidgetItem(art.title))
-            self.results_table.setItem(row, 3, QTableWidgetItem(art.url))
-
-    def open_result_link(self, row: int, _col: int) -> None:
-        item = self.results_table.item(row, 3)
-        if item and item.text():
-            webbrowser.open(item.text())
+        self.results_table.setUpdatesEnabled(False)
+        try:
+            self._articles_model.set_rows(articles)
+        finally:
+            self.results_table.setUpdatesEnabled(True)
+
+    def open_result_link(self, index: QModelIndex) -> None:
+        source_index = self._articles_proxy.mapToSource(index)
+        if not source_index.isValid():
+            return
+        url = self._articles_model.article_at(source_index.row()).url
+        if url:
+            webbrowser.open(url)
 
     def export_current_results(self) -> None:
         articles = getattr(self, "_current_result_articles", [])
@@ -357,7 +437,12 @@ class MainWindow(QMainWindow):
             last_run_at=None,
             last_status=None,
         )
-        self.report_service.save_report(report)
+        try:
+            self.report_service.save_report(report)
+        except ValueError:
+            QMessageBox.critical(self, "Feil", "Ugyldig sendetid. Bruk formatet HH:MM.")
+            return
+        self.scheduler_service.reschedule_reports()
         self._load_reports()
 
     def load_report_to_form(self, item: QListWidgetItem) -> None:
@@ -375,20 +460,47 @@ class MainWindow(QMainWindow):
             return
         r = item.data(Qt.UserRole)
         self.report_service.delete_report(r.id)
+        self.scheduler_service.reschedule_reports()
         self._load_reports()
 
     def run_reports_now(self) -> None:
-        self.scheduler_service.run_due_reports()
+        worker = ReportsWorker(self.scheduler_service)
+        worker.signals.finished.connect(self._on_reports_done)
+        worker.signals.failed.connect(self._on_reports_failed)
+        self._reports_worker = worker
+        self.run_now_btn.setEnabled(False)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_reports_done(self, _result) -> None:
+        self.run_now_btn.setEnabled(True)
+        self._reports_worker = None
         self._load_reports()
         QMessageBox.information(self, "Ferdig", "Rapport-jobber kjørt.")
 
+    def _on_reports_failed(self, message: str) -> None:
+        self.run_now_btn.setEnabled(True)
+        self._reports_worker = None
+        self._load_reports()
+        QMessageBox.critical(self, "Feil", message)
+
     def send_test_email(self) -> None:
-        try:
-            html = "<html><body><h3>Test-epost</h3><p>SMTP-oppsett virker.</p></body></html>"
-            self.mailer.send_html(self.report_email.text().strip(), "Test fra Medieovervåkning", html)
-            QMessageBox.information(self, "OK", "Test-epost sendt")
-        except Exception as exc:
-            QMessageBox.critical(self, "Feil", str(exc))
+        html = "<html><body><h3>Test-epost</h3><p>SMTP-oppsett virker.</p></body></html>"
+        worker = TestEmailWorker(self.mailer, self.report_email.text().strip(), "Test fra Medieovervåkning", html)
+        worker.signals.finished.connect(self._on_test_email_done)
+        worker.signals.failed.connect(self._on_test_email_failed)
+        self._test_email_worker = worker
+        self.send_test_btn.setEnabled(False)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_test_email_done(self, _result) -> None:
+        self.send_test_btn.setEnabled(True)
+        self._test_email_worker = None
+        QMessageBox.information(self, "OK", "Test-epost sendt")
+
+    def _on_test_email_failed(self, message: str) -> None:
+        self.send_test_btn.setEnabled(True)
+        self._test_email_worker = None
+        QMessageBox.critical(self, "Feil", message)
 
     def _load_settings(self) -> None:
         self.smtp_host.setText(self.db.get_setting("smtp_host", ""))
@@ -403,11 +515,15 @@ class MainWindow(QMainWindow):
         self.sources_text.setPlainText("\n".join(lines))
 
     def save_smtp(self) -> None:
-        self.db.set_setting("smtp_host", self.smtp_host.text().strip())
-        self.db.set_setting("smtp_port", self.smtp_port.text().strip())
-        self.db.set_setting("smtp_user", self.smtp_user.text().strip())
-        self.db.set_setting("smtp_password", self.smtp_password.text().strip())
-        self.db.set_setting("smtp_from", self.smtp_from.text().strip())
+        self.db.set_settings(
+            {
+                "smtp_host": self.smtp_host.text().strip(),
+                "smtp_port": self.smtp_port.text().strip(),
+                "smtp_user": self.smtp_user.text().strip(),
+                "smtp_password": self.smtp_password.text().strip(),
+                "smtp_from": self.smtp_from.text().strip(),
+            }
+        )
         QMessageBox.information(self, "OK", "SMTP lagret")
 
     def save_sources(self) -> None:
@@ -432,7 +548,7 @@ def apply_windows_neutral_style(app: QApplication) -> None:
         QMainWindow, QTabWidget::pane { background: #f5f5f5; }
         QGroupBox { border: 1px solid #cfcfcf; border-radius: 4px; margin-top: 10px; padding: 10px; background: #ffffff; }
         QGroupBox::title { subcontrol-origin: margin; left: 8px; padding: 0 4px; color: #303030; }
-        QLineEdit, QTextEdit, QDateEdit, QComboBox, QSpinBox, QListWidget, QTableWidget { background: #ffffff; border: 1px solid #c8c8c8; padding: 4px; }
+        QLineEdit, QTextEdit, QDateEdit, QComboBox, QSpinBox, QListWidget, QTableView { background: #ffffff; border: 1px solid #c8c8c8; padding: 4px; }
         QPushButton { background: #e9e9e9; border: 1px solid #bdbdbd; padding: 6px 12px; border-radius: 4px; }
         QPushButton:hover { background: #dddddd; }
         QHeaderView::section { background: #efefef; border: 1px solid #d0d0d0; padding: 4px; }
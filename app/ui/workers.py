@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerSignals(QObject):
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class SearchWorker(QRunnable):
+    def __init__(
+        self,
+        search_engine,
+        include_terms_text: str,
+        exclude_terms_text: str,
+        date_from: datetime | None,
+        date_to: datetime | None,
+        last_x_days: int | None,
+        refresh_sources: bool,
+    ) -> None:
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.search_engine = search_engine
+        self.include_terms_text = include_terms_text
+        self.exclude_terms_text = exclude_terms_text
+        self.date_from = date_from
+        self.date_to = date_to
+        self.last_x_days = last_x_days
+        self.refresh_sources = refresh_sources
+
+    def run(self) -> None:
+        try:
+            results = self.search_engine.run_search(
+                self.include_terms_text,
+                self.exclude_terms_text,
+                self.date_from,
+                self.date_to,
+                self.last_x_days,
+                refresh_sources=self.refresh_sources,
+            )
+        except Exception as exc:
+            logger.exception("Feil ved manuelt søk")
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(results)
+
+
+class ReportsWorker(QRunnable):
+    def __init__(self, scheduler_service) -> None:
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.scheduler_service = scheduler_service
+
+    def run(self) -> None:
+        try:
+            self.scheduler_service.run_all_reports()
+        except Exception as exc:
+            logger.exception("Feil ved manuell kjøring av rapporter")
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(None)
+
+
+class TestEmailWorker(QRunnable):
+    def __init__(self, mailer, to_email: str, subject: str, html: str) -> None:
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.mailer = mailer
+        self.to_email = to_email
+        self.subject = subject
+        self.html = html
+
+    def run(self) -> None:
+        try:
+            self.mailer.send_html(self.to_email, self.subject, self.html)
+        except Exception as exc:
+            logger.exception("Feil ved sending av test-epost")
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(None)
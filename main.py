@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import sys
 
+from PySide6.QtCore import QThreadPool
 from PySide6.QtWidgets import QApplication
 
 from app.database import Database
@@ -34,6 +35,8 @@ def main() -> int:
         return app.exec()
     finally:
         scheduler.stop()
+        QThreadPool.globalInstance().waitForDone()
+        db.close()
 
 
 if __name__ == "__main__":
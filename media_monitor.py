@@ -4,30 +4,79 @@
 from __future__ import annotations
 
 import argparse
+import base64
 import dataclasses
 import email.message
+import email.policy
+import gzip
+import http.client
+import io
 import json
 import smtplib
 import sqlite3
+import threading
 import time
 import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
+from email.generator import BytesGenerator
 from email.utils import parsedate_to_datetime
+from operator import attrgetter
 from pathlib import Path
-from typing import Iterable
+from typing import IO, Iterable, Iterator
+
+try:
+    from lxml import etree as LET
+except ImportError:
+    LET = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 DB_PATH = Path("autosok.db")
 DEFAULT_FEED_SIZE = 100
+MAX_RULE_WORKERS = 8
+_UTC = timezone.utc
 
+FEED_HOST = "news.google.com"
+MAX_FEED_CONNECTIONS = 8
+MAX_FEED_REDIRECTS = 3
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+_FEED_HEADERS = {"User-Agent": "media-monitor/1.0", "Accept-Encoding": "gzip"}
+_FEED_POOL: list[http.client.HTTPSConnection] = []
+_FEED_POOL_LOCK = threading.Lock()
 
-@dataclasses.dataclass
+_FEED_TTL = 300.0
+_FEED_CACHE: dict[tuple[str, int], tuple[float, list[Article]]] = {}
+_FEED_CACHE_LOCK = threading.Lock()
+
+_CONFIG_CACHE: dict[Path, tuple[int, dict]] = {}
+
+_CONNECTIONS: dict[Path, sqlite3.Connection] = {}
+_DB_LOCK = threading.RLock()
+_AUTOSOK_CACHE: dict[Path, tuple[int, list[AutoSearch]]] = {}
+_AUTOSOK_DIRTY = threading.Event()
+
+_INSERT_AUTOSOK_SQL = """
+    INSERT INTO autosok (keyword, start_hour, start_minute, period_hours, email_to)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SELECT_AUTOSOK_SQL = "SELECT id, keyword, start_hour, start_minute, period_hours, email_to FROM autosok"
+_SELECT_AUTOSOK_DUE_SQL = _SELECT_AUTOSOK_SQL + " WHERE start_hour = ? AND start_minute = ?"
+
+
+@dataclasses.dataclass(slots=True)
 class Article:
     title: str
     link: str
     source: str
     published: datetime
+    published_ts: float
 
 
 @dataclasses.dataclass
@@ -47,25 +96,158 @@ def parse_iso_datetime(value: str) -> datetime:
     return dt
 
 
-def fetch_google_news_rss(keyword: str, feed_size: int = DEFAULT_FEED_SIZE) -> bytes:
+def clear_feed_cache() -> None:
+    with _FEED_CACHE_LOCK:
+        _FEED_CACHE.clear()
+
+
+def _acquire_feed_connection() -> tuple[http.client.HTTPSConnection, bool]:
+    with _FEED_POOL_LOCK:
+        if _FEED_POOL:
+            return _FEED_POOL.pop(), True
+    return _new_feed_connection(), False
+
+
+def _new_feed_connection() -> http.client.HTTPSConnection:
+    proxy = urllib.request.getproxies().get("https")
+    if not proxy or urllib.request.proxy_bypass(FEED_HOST):
+        return http.client.HTTPSConnection(FEED_HOST, timeout=20)
+
+    parts = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    headers = {}
+    if parts.username:
+        credentials = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+        headers["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+    conn = http.client.HTTPSConnection(parts.hostname, parts.port or 80, timeout=20)
+    conn.set_tunnel(FEED_HOST, headers=headers)
+    return conn
+
+
+def _release_feed_connection(conn: http.client.HTTPSConnection) -> None:
+    with _FEED_POOL_LOCK:
+        if len(_FEED_POOL) < MAX_FEED_CONNECTIONS:
+            _FEED_POOL.append(conn)
+            return
+    conn.close()
+
+
+def _request_feed(conn: http.client.HTTPSConnection, path: str) -> http.client.HTTPResponse:
+    conn.request("GET", path, headers=_FEED_HEADERS)
+    return conn.getresponse()
+
+
+def _redirect_path(location: str) -> str | None:
+    target = urllib.parse.urlsplit(urllib.parse.urljoin(f"https://{FEED_HOST}/", location))
+    if target.scheme != "https" or target.hostname != FEED_HOST:
+        return None
+    return urllib.parse.urlunsplit(("", "", target.path or "/", target.query, ""))
+
+
+@contextmanager
+def _open_feed(keyword: str, feed_size: int) -> Iterator[http.client.HTTPResponse]:
     query = urllib.parse.quote(keyword)
-    url = (
-        "https://news.google.com/rss/search?"
-        f"q={query}&hl=no&gl=NO&ceid=NO:no&num={feed_size}"
-    )
-    req = urllib.request.Request(url, headers={"User-Agent": "media-monitor/1.0"})
+    path = f"/rss/search?q={query}&hl=no&gl=NO&ceid=NO:no&num={feed_size}"
+    conn, reused = _acquire_feed_connection()
     try:
-        with urllib.request.urlopen(req, timeout=20) as response:
-            return response.read()
-    except Exception as exc:
+        try:
+            response = _request_feed(conn, path)
+        except (OSError, http.client.HTTPException):
+            if not reused:
+                raise
+            conn.close()
+            response = _request_feed(conn, path)
+
+        for _ in range(MAX_FEED_REDIRECTS):
+            if response.status not in _REDIRECT_STATUSES:
+                break
+            location = response.getheader("Location", "")
+            response.read()
+            redirect_path = _redirect_path(location)
+            if redirect_path is None:
+                raise RuntimeError(f"Kunne ikke hente nyhetsfeed: omdirigert til {location}")
+            response = _request_feed(conn, redirect_path)
+    except (OSError, http.client.HTTPException) as exc:
+        conn.close()
         raise RuntimeError(f"Kunne ikke hente nyhetsfeed: {exc}") from exc
+    except BaseException:
+        conn.close()
+        raise
+
+    if response.status != 200:
+        conn.close()
+        raise RuntimeError(f"Kunne ikke hente nyhetsfeed: HTTP {response.status} {response.reason}")
+
+    try:
+        yield response
+    except BaseException:
+        conn.close()
+        raise
+
+    try:
+        response.read()
+    except (OSError, http.client.HTTPException):
+        conn.close()
+        return
+    _release_feed_connection(conn)
+
+
+def _is_gzip(response: http.client.HTTPResponse) -> bool:
+    return response.headers.get("Content-Encoding", "").lower() == "gzip"
+
+
+def fetch_google_news_rss(keyword: str, feed_size: int = DEFAULT_FEED_SIZE) -> bytes:
+    with _open_feed(keyword, feed_size) as response:
+        try:
+            body = response.read()
+            return gzip.decompress(body) if _is_gzip(response) else body
+        except Exception as exc:
+            raise RuntimeError(f"Kunne ikke hente nyhetsfeed: {exc}") from exc
+
+
+def fetch_and_parse(keyword: str, feed_size: int = DEFAULT_FEED_SIZE) -> list[Article]:
+    key = (keyword, feed_size)
+    with _FEED_CACHE_LOCK:
+        cached = _FEED_CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _FEED_TTL:
+        return list(cached[1])
+
+    with _open_feed(keyword, feed_size) as response:
+        stream = gzip.GzipFile(fileobj=response) if _is_gzip(response) else response
+        try:
+            articles = _parse_items(stream)
+        except (OSError, EOFError, http.client.HTTPException) as exc:
+            raise RuntimeError(f"Kunne ikke hente nyhetsfeed: {exc}") from exc
+
+    now = time.monotonic()
+    with _FEED_CACHE_LOCK:
+        for stale in [k for k, (ts, _) in _FEED_CACHE.items() if now - ts >= _FEED_TTL]:
+            del _FEED_CACHE[stale]
+        _FEED_CACHE[key] = (now, articles)
+    return list(articles)
+
+
+def _iter_rss_items(stream: IO[bytes]) -> Iterator:
+    if LET is not None:
+        for _event, item in LET.iterparse(stream, events=("end",), tag="item", resolve_entities=False):
+            yield item
+            item.clear()
+            while item.getprevious() is not None:
+                del item.getparent()[0]
+        return
+
+    for _event, elem in ET.iterparse(stream, events=("end",)):
+        if elem.tag == "item":
+            yield elem
+            elem.clear()
 
 
 def parse_rss(xml_bytes: bytes) -> list[Article]:
-    root = ET.fromstring(xml_bytes)
-    items = root.findall("./channel/item")
+    return _parse_items(io.BytesIO(xml_bytes))
+
+
+def _parse_items(stream: IO[bytes]) -> list[Article]:
     articles: list[Article] = []
-    for item in items:
+    for item in _iter_rss_items(stream):
         title = (item.findtext("title") or "").strip()
         link = (item.findtext("link") or "").strip()
         source = (item.findtext("source") or "Ukjent kilde").strip()
@@ -76,14 +258,17 @@ def parse_rss(xml_bytes: bytes) -> list[Article]:
 
         published = parsedate_to_datetime(published_text)
         if published.tzinfo is None:
-            published = published.replace(tzinfo=timezone.utc)
+            published = published.replace(tzinfo=_UTC)
+        elif published.tzinfo is not _UTC:
+            published = published.astimezone(_UTC)
 
         articles.append(
             Article(
                 title=title,
                 link=link,
                 source=source,
-                published=published.astimezone(timezone.utc),
+                published=published,
+                published_ts=published.timestamp(),
             )
         )
 
@@ -95,27 +280,81 @@ def filter_articles(
     start: datetime,
     end: datetime,
 ) -> list[Article]:
-    start_utc = start.astimezone(timezone.utc)
-    end_utc = end.astimezone(timezone.utc)
-    return [a for a in articles if start_utc <= a.published <= end_utc]
+    start_ts = start.timestamp()
+    end_ts = end.timestamp()
+    result = [a for a in articles if start_ts <= a.published_ts <= end_ts]
+    result.sort(key=attrgetter("published_ts"), reverse=True)
+    return result
 
 
 def format_report(keyword: str, start: datetime, end: datetime, articles: list[Article]) -> str:
-    lines = [
-        f"Rapport for søkeord: {keyword}",
-        f"Tidsrom: {start.isoformat()} til {end.isoformat()}",
-        f"Antall treff: {len(articles)}",
-        "",
-    ]
+    header = (
+        f"Rapport for søkeord: {keyword}\n"
+        f"Tidsrom: {start.isoformat()} til {end.isoformat()}\n"
+        f"Antall treff: {len(articles)}\n"
+    )
+    return header + "".join(
+        f"\n{idx}. {article.title}\n"
+        f"   Kilde: {article.source}\n"
+        f"   Tid: {article.published.isoformat()}\n"
+        f"   Lenke: {article.link}\n"
+        for idx, article in enumerate(articles, start=1)
+    )
 
-    for idx, article in enumerate(sorted(articles, key=lambda a: a.published, reverse=True), start=1):
-        lines.append(f"{idx}. {article.title}")
-        lines.append(f"   Kilde: {article.source}")
-        lines.append(f"   Tid: {article.published.isoformat()}")
-        lines.append(f"   Lenke: {article.link}")
-        lines.append("")
 
-    return "\n".join(lines)
+class SmtpSender:
+    def __init__(self, smtp_host: str, smtp_port: int, smtp_user: str, smtp_password: str) -> None:
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.smtp_user = smtp_user
+        self.smtp_password = smtp_password
+        self._smtp: smtplib.SMTP_SSL | None = None
+
+    def __enter__(self) -> SmtpSender:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _connection(self) -> smtplib.SMTP_SSL:
+        if self._smtp is None:
+            smtp = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=20)
+            try:
+                smtp.login(self.smtp_user, self.smtp_password)
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+        return self._smtp
+
+    def build_message(self, to_email: str, subject: str, body: str) -> bytes:
+        msg = email.message.EmailMessage()
+        msg["From"] = self.smtp_user
+        msg["To"] = to_email
+        msg["Subject"] = subject
+        msg.set_content(body)
+        buf = io.BytesIO()
+        BytesGenerator(buf, policy=email.policy.SMTP).flatten(msg)
+        return buf.getvalue()
+
+    def send(self, to_email: str, subject: str, body: str) -> None:
+        self.send_bytes(to_email, self.build_message(to_email, subject, body))
+
+    def send_bytes(self, to_email: str, message: bytes) -> None:
+        try:
+            self._connection().sendmail(self.smtp_user, [to_email], message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connection().sendmail(self.smtp_user, [to_email], message)
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
 
 
 def send_email_report(
@@ -127,19 +366,31 @@ def send_email_report(
     subject: str,
     body: str,
 ) -> None:
-    msg = email.message.EmailMessage()
-    msg["From"] = smtp_user
-    msg["To"] = to_email
-    msg["Subject"] = subject
-    msg.set_content(body)
+    with SmtpSender(smtp_host, smtp_port, smtp_user, smtp_password) as sender:
+        sender.send(to_email, subject, body)
+
+
+def _db_key(db_path: Path) -> Path:
+    return Path(db_path).resolve()
+
+
+def _connection(db_path: Path) -> sqlite3.Connection:
+    key = _db_key(db_path)
+    conn = _CONNECTIONS.get(key)
+    if conn is None:
+        conn = sqlite3.connect(key, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _CONNECTIONS[key] = conn
+    return conn
 
-    with smtplib.SMTP_SSL(smtp_host, smtp_port, timeout=20) as smtp:
-        smtp.login(smtp_user, smtp_password)
-        smtp.send_message(msg)
+
+def _autosok_row(cursor: sqlite3.Cursor, row: tuple) -> AutoSearch:
+    return AutoSearch(*row)
 
 
 def ensure_db(db_path: Path = DB_PATH) -> None:
-    with sqlite3.connect(db_path) as conn:
+    with _DB_LOCK, _connection(db_path) as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS autosok (
@@ -152,6 +403,7 @@ def ensure_db(db_path: Path = DB_PATH) -> None:
             )
             """
         )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_autosok_time ON autosok(start_hour, start_minute)")
 
 
 def add_autosok(
@@ -161,58 +413,91 @@ def add_autosok(
     email_to: str,
     db_path: Path = DB_PATH,
 ) -> None:
-    hour, minute = [int(x) for x in time_of_day.split(":", maxsplit=1)]
-    with sqlite3.connect(db_path) as conn:
-        conn.execute(
-            """
-            INSERT INTO autosok (keyword, start_hour, start_minute, period_hours, email_to)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (keyword, hour, minute, period_hours, email_to),
-        )
+    add_autosok_bulk([(keyword, time_of_day, period_hours, email_to)], db_path)
+
+
+def add_autosok_bulk(rules: Iterable[tuple[str, str, int, str]], db_path: Path = DB_PATH) -> None:
+    rows = []
+    for keyword, time_of_day, period_hours, email_to in rules:
+        hour, minute = [int(x) for x in time_of_day.split(":", maxsplit=1)]
+        rows.append((keyword, hour, minute, period_hours, email_to))
+
+    with _DB_LOCK, _connection(db_path) as conn:
+        conn.executemany(_INSERT_AUTOSOK_SQL, rows)
+    _AUTOSOK_DIRTY.set()
 
 
 def load_autosok(db_path: Path = DB_PATH) -> list[AutoSearch]:
-    with sqlite3.connect(db_path) as conn:
-        rows = conn.execute(
-            "SELECT id, keyword, start_hour, start_minute, period_hours, email_to FROM autosok"
-        ).fetchall()
-    return [AutoSearch(*row) for row in rows]
+    key = _db_key(db_path)
+    with _DB_LOCK:
+        if _AUTOSOK_DIRTY.is_set():
+            _AUTOSOK_DIRTY.clear()
+            _AUTOSOK_CACHE.clear()
+
+        conn = _connection(db_path)
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        cached = _AUTOSOK_CACHE.get(key)
+        if cached is not None and cached[0] == version:
+            return list(cached[1])
+
+        cur = conn.cursor()
+        cur.row_factory = _autosok_row
+        rules = cur.execute(_SELECT_AUTOSOK_SQL).fetchall()
+        _AUTOSOK_CACHE[key] = (version, rules)
+        return list(rules)
+
+
+def load_autosok_due(hour: int, minute: int, db_path: Path = DB_PATH) -> list[AutoSearch]:
+    with _DB_LOCK:
+        cur = _connection(db_path).cursor()
+        cur.row_factory = _autosok_row
+        return cur.execute(_SELECT_AUTOSOK_DUE_SQL, (hour, minute)).fetchall()
 
 
 def run_search(keyword: str, start: datetime, end: datetime) -> list[Article]:
-    xml_data = fetch_google_news_rss(keyword)
-    articles = parse_rss(xml_data)
-    return filter_articles(articles, start, end)
+    return filter_articles(fetch_and_parse(keyword), start, end)
+
+
+def _process_rule(rule: AutoSearch, now: datetime) -> str:
+    end = now
+    start = end - timedelta(hours=rule.period_hours)
+    articles = run_search(rule.keyword, start, end)
+    return format_report(rule.keyword, start, end, articles)
+
+
+def _load_config(config_path: Path) -> dict:
+    mtime_ns = config_path.stat().st_mtime_ns
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    raw = config_path.read_bytes()
+    config = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    _CONFIG_CACHE[config_path] = (mtime_ns, config)
+    return config
 
 
 def run_pending_autosok(config_path: Path) -> None:
-    config = json.loads(config_path.read_text())
+    config = _load_config(config_path)
     smtp = config["smtp"]
     now = datetime.now(timezone.utc)
 
-    for rule in load_autosok():
-        if now.hour != rule.start_hour or now.minute != rule.start_minute:
-            continue
-
-        end = now
-        start = end - timedelta(hours=rule.period_hours)
+    due = load_autosok_due(now.hour, now.minute)
+    if not due:
+        return
 
-        try:
-            articles = run_search(rule.keyword, start, end)
-            body = format_report(rule.keyword, start, end, articles)
-            send_email_report(
-                smtp_host=smtp["host"],
-                smtp_port=smtp["port"],
-                smtp_user=smtp["user"],
-                smtp_password=smtp["password"],
-                to_email=rule.email_to,
-                subject=f"Daglig medieovervåkning: {rule.keyword}",
-                body=body,
-            )
-            print(f"[OK] Sendte rapport for regel {rule.id}")
-        except Exception as exc:
-            print(f"[FEIL] Regel {rule.id} feilet: {exc}")
+    with (
+        SmtpSender(smtp["host"], smtp["port"], smtp["user"], smtp["password"]) as sender,
+        ThreadPoolExecutor(max_workers=min(MAX_RULE_WORKERS, len(due))) as pool,
+    ):
+        futures = {pool.submit(_process_rule, rule, now): rule for rule in due}
+        for future in as_completed(futures):
+            rule = futures[future]
+            try:
+                sender.send(rule.email_to, f"Daglig medieovervåkning: {rule.keyword}", future.result())
+                print(f"[OK] Sendte rapport for regel {rule.id}")
+            except Exception as exc:
+                print(f"[FEIL] Regel {rule.id} feilet: {exc}")
 
 
 def run_scheduler(config_path: Path) -> None:
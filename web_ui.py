@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
-"""Enkel web-UI for medieovervåkning uten eksterne avhengigheter."""
+"""Enkel web-UI for medieovervåkning uten eksterne avhengigheter.
+
+`app` er en WSGI-applikasjon. `python web_ui.py` starter den innebygde
+utviklingsserveren; i produksjon kan den kjøres med f.eks.
+`gunicorn web_ui:app -k sync -w 4`.
+"""
 
 from __future__ import annotations
 
+import functools
+import threading
 from datetime import datetime, timezone
 from html import escape
 from http import HTTPStatus
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn
+from string import Template
+from typing import Callable, Iterable, Iterator
 from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIServer, make_server
 
 from media_monitor import (
     add_autosok,
@@ -20,118 +30,43 @@ from media_monitor import (
 
 HOST = "0.0.0.0"
 PORT = 8080
+CACHE_MAX_AGE = 5
 
+StartResponse = Callable[..., Callable[[bytes], object]]
 
-class MediaMonitorHandler(BaseHTTPRequestHandler):
-    def do_GET(self) -> None:  # noqa: N802
-        if self.path != "/":
-            self.send_error(HTTPStatus.NOT_FOUND, "Fant ikke siden")
-            return
-
-        self._send_html(self._render_page())
-
-    def do_POST(self) -> None:  # noqa: N802
-        if self.path not in {"/search", "/add-autosok"}:
-            self.send_error(HTTPStatus.NOT_FOUND, "Fant ikke siden")
-            return
-
-        content_length = int(self.headers.get("Content-Length", "0"))
-        payload = self.rfile.read(content_length).decode("utf-8")
-        form = parse_qs(payload)
-
-        if self.path == "/search":
-            html = self._handle_search(form)
-            self._send_html(html)
-            return
-
-        html = self._handle_add_autosok(form)
-        self._send_html(html)
-
-    def _handle_search(self, form: dict[str, list[str]]) -> str:
-        keyword = form.get("keyword", [""])[0].strip()
-        start_text = form.get("start", [""])[0].strip()
-        end_text = form.get("end", [""])[0].strip()
-
-        if not keyword or not start_text or not end_text:
-            return self._render_page(error="Fyll inn søkeord, start og sluttid.")
-
-        try:
-            start = parse_iso_datetime(start_text)
-            end = parse_iso_datetime(end_text)
-            articles = run_search(keyword, start, end)
-            report = format_report(keyword, start, end, articles)
-            return self._render_page(report=report)
-        except ValueError:
-            return self._render_page(error="Ugyldig datoformat. Bruk ISO-format.")
-        except RuntimeError as exc:
-            return self._render_page(error=f"Kunne ikke fullføre søket: {exc}")
-
-    def _handle_add_autosok(self, form: dict[str, list[str]]) -> str:
-        keyword = form.get("keyword", [""])[0].strip()
-        time_of_day = form.get("time", [""])[0].strip()
-        period_text = form.get("period_hours", [""])[0].strip()
-        email = form.get("email", [""])[0].strip()
-
-        if not keyword or not time_of_day or not period_text or not email:
-            return self._render_page(error="Fyll inn alle felter for autosøk.")
-
-        try:
-            period_hours = int(period_text)
-            add_autosok(keyword, time_of_day, period_hours, email)
-            return self._render_page(message="Autosøk lagret.")
-        except ValueError:
-            return self._render_page(error="Ugyldig input. Sjekk klokkeslett (HH:MM) og antall timer.")
-
-    def _render_page(self, report: str = "", message: str = "", error: str = "") -> str:
-        ensure_db()
-        autosok = load_autosok()
-        now = datetime.now(timezone.utc).replace(microsecond=0)
-        table_rows = "".join(
-            "<tr>"
-            f"<td>{rule.id}</td>"
-            f"<td>{escape(rule.keyword)}</td>"
-            f"<td>{rule.start_hour:02d}:{rule.start_minute:02d} UTC</td>"
-            f"<td>{rule.period_hours}</td>"
-            f"<td>{escape(rule.email_to)}</td>"
-            "</tr>"
-            for rule in autosok
-        )
-        if not table_rows:
-            table_rows = "<tr><td colspan='5'>Ingen autosøk lagret ennå.</td></tr>"
-
-        notice = ""
-        if message:
-            notice = f"<p style='color: #0a7a00'><b>{escape(message)}</b></p>"
-        if error:
-            notice = f"<p style='color: #c60000'><b>{escape(error)}</b></p>"
+_DB_READY = threading.Event()
+_escape_cached = functools.lru_cache(maxsize=2048)(escape)
 
-        report_html = ""
-        if report:
-            report_html = f"<h2>Søkeresultat</h2><pre>{escape(report)}</pre>"
+_ROW_FMT = (
+    "<tr><td>{id}</td><td>{keyword}</td><td>{hour:02d}:{minute:02d} UTC</td>"
+    "<td>{period}</td><td>{email}</td></tr>"
+)
 
-        return f"""
+_PAGE_HEAD = Template("""
 <!doctype html>
 <html lang="no">
 <head>
   <meta charset="utf-8">
   <title>Medieovervåkning</title>
   <style>
-    body {{ font-family: Arial, sans-serif; margin: 2rem auto; max-width: 980px; line-height: 1.4; }}
-    h1, h2 {{ margin-bottom: 0.5rem; }}
-    .box {{ border: 1px solid #ddd; border-radius: 8px; padding: 1rem; margin-bottom: 1rem; }}
-    label {{ display: block; margin-top: 0.6rem; font-weight: 600; }}
-    input {{ width: 100%; padding: 0.5rem; margin-top: 0.2rem; box-sizing: border-box; }}
-    button {{ margin-top: 0.8rem; padding: 0.6rem 1rem; cursor: pointer; }}
-    table {{ width: 100%; border-collapse: collapse; }}
-    th, td {{ border: 1px solid #ddd; padding: 0.5rem; text-align: left; }}
-    pre {{ white-space: pre-wrap; background: #f7f7f7; padding: 1rem; border-radius: 8px; }}
-    .muted {{ color: #666; }}
+    body { font-family: Arial, sans-serif; margin: 2rem auto; max-width: 980px; line-height: 1.4; }
+    h1, h2 { margin-bottom: 0.5rem; }
+    .box { border: 1px solid #ddd; border-radius: 8px; padding: 1rem; margin-bottom: 1rem; }
+    label { display: block; margin-top: 0.6rem; font-weight: 600; }
+    input { width: 100%; padding: 0.5rem; margin-top: 0.2rem; box-sizing: border-box; }
+    button { margin-top: 0.8rem; padding: 0.6rem 1rem; cursor: pointer; }
+    table { width: 100%; border-collapse: collapse; }
+    th, td { border: 1px solid #ddd; padding: 0.5rem; text-align: left; }
+    pre { white-space: pre-wrap; background: #f7f7f7; padding: 1rem; border-radius: 8px; }
+    .muted { color: #666; }
   </style>
 </head>
 <body>
   <h1>Medieovervåkning</h1>
-  <p class="muted">Nå: {now.isoformat()} (UTC)</p>
-  {notice}
+  <p class="muted">Nå: $now_iso (UTC)</p>
+""")
+
+_PAGE_BODY = Template("""  $notice
 
   <div class="box">
     <h2>Engangssøk</h2>
@@ -140,10 +75,10 @@ class MediaMonitorHandler(BaseHTTPRequestHandler):
       <input id="search-keyword" name="keyword" placeholder="f.eks. Equinor" required>
 
       <label for="search-start">Starttid (ISO)</label>
-      <input id="search-start" name="start" value="{now.replace(hour=0, minute=0, second=0).isoformat()}" required>
+      <input id="search-start" name="start" value="$start_default" required>
 
       <label for="search-end">Sluttid (ISO)</label>
-      <input id="search-end" name="end" value="{now.isoformat()}" required>
+      <input id="search-end" name="end" value="$end_default" required>
 
       <button type="submit">Kjør søk</button>
     </form>
@@ -174,27 +109,166 @@ class MediaMonitorHandler(BaseHTTPRequestHandler):
       <thead>
         <tr><th>ID</th><th>Søkeord</th><th>Tidspunkt</th><th>Timer</th><th>E-post</th></tr>
       </thead>
-      <tbody>{table_rows}</tbody>
+      <tbody>$table_rows</tbody>
     </table>
   </div>
 
-  {report_html}
+""")
+
+_PAGE_TAIL = Template("""  $report_html
 </body>
 </html>
-"""
+""")
+
+
+def _handle_search(form: dict[str, list[str]]) -> dict[str, str]:
+    keyword = form.get("keyword", [""])[0].strip()
+    start_text = form.get("start", [""])[0].strip()
+    end_text = form.get("end", [""])[0].strip()
+
+    if not keyword or not start_text or not end_text:
+        return {"error": "Fyll inn søkeord, start og sluttid."}
+
+    try:
+        start = parse_iso_datetime(start_text)
+        end = parse_iso_datetime(end_text)
+        articles = run_search(keyword, start, end)
+        return {"report": format_report(keyword, start, end, articles)}
+    except ValueError:
+        return {"error": "Ugyldig datoformat. Bruk ISO-format."}
+    except RuntimeError as exc:
+        return {"error": f"Kunne ikke fullføre søket: {exc}"}
+
+
+def _handle_add_autosok(form: dict[str, list[str]]) -> dict[str, str]:
+    keyword = form.get("keyword", [""])[0].strip()
+    time_of_day = form.get("time", [""])[0].strip()
+    period_text = form.get("period_hours", [""])[0].strip()
+    email = form.get("email", [""])[0].strip()
+
+    if not keyword or not time_of_day or not period_text or not email:
+        return {"error": "Fyll inn alle felter for autosøk."}
+
+    try:
+        period_hours = int(period_text)
+        add_autosok(keyword, time_of_day, period_hours, email)
+        return {"message": "Autosøk lagret."}
+    except ValueError:
+        return {"error": "Ugyldig input. Sjekk klokkeslett (HH:MM) og antall timer."}
+
+
+def _render_page(
+    outcome: dict[str, str] | None = None,
+    action: Callable[[], dict[str, str]] | None = None,
+) -> Iterator[bytes]:
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    now_iso = now.isoformat()
+    yield _PAGE_HEAD.substitute(now_iso=now_iso).encode("utf-8")
+
+    if action is not None:
+        outcome = action()
+    outcome = outcome or {}
+    message = outcome.get("message", "")
+    error = outcome.get("error", "")
+    report = outcome.get("report", "")
+
+    notice = ""
+    if message:
+        notice = f"<p style='color: #0a7a00'><b>{escape(message)}</b></p>"
+    if error:
+        notice = f"<p style='color: #c60000'><b>{escape(error)}</b></p>"
+
+    table_rows = "".join(
+        _ROW_FMT.format(
+            id=rule.id,
+            keyword=_escape_cached(rule.keyword),
+            hour=rule.start_hour,
+            minute=rule.start_minute,
+            period=rule.period_hours,
+            email=_escape_cached(rule.email_to),
+        )
+        for rule in load_autosok()
+    )
+    if not table_rows:
+        table_rows = "<tr><td colspan='5'>Ingen autosøk lagret ennå.</td></tr>"
+
+    yield _PAGE_BODY.substitute(
+        notice=notice,
+        start_default=now.replace(hour=0, minute=0, second=0).isoformat(),
+        end_default=now_iso,
+        table_rows=table_rows,
+    ).encode("utf-8")
+
+    report_html = ""
+    if report:
+        report_html = f"<h2>Søkeresultat</h2><pre>{escape(report)}</pre>"
+    yield _PAGE_TAIL.substitute(report_html=report_html).encode("utf-8")
+
+
+def _start_html(
+    start_response: StartResponse,
+    status: HTTPStatus = HTTPStatus.OK,
+    cache_max_age: int | None = None,
+    content_length: int | None = None,
+) -> None:
+    headers = [("Content-Type", "text/html; charset=utf-8")]
+    if cache_max_age is not None:
+        headers.append(("Cache-Control", f"max-age={cache_max_age}"))
+    if content_length is not None:
+        headers.append(("Content-Length", str(content_length)))
+    start_response(f"{status.value} {status.phrase}", headers)
+
+
+def _error_page(start_response: StartResponse, status: HTTPStatus, text: str) -> list[bytes]:
+    data = f"<h1>{text}</h1>".encode("utf-8")
+    _start_html(start_response, status, content_length=len(data))
+    return [data]
+
+
+def _read_form(environ: dict) -> dict[str, list[str]]:
+    content_length = int(environ.get("CONTENT_LENGTH") or 0)
+    payload = environ["wsgi.input"].read(content_length).decode("utf-8")
+    return parse_qs(payload)
+
+
+def _ensure_db_once() -> None:
+    if not _DB_READY.is_set():
+        ensure_db()
+        _DB_READY.set()
+
+
+def app(environ: dict, start_response: StartResponse) -> Iterable[bytes]:
+    _ensure_db_once()
+    method = environ["REQUEST_METHOD"]
+    path = environ.get("PATH_INFO") or "/"
+
+    if method == "GET" and path == "/":
+        _start_html(start_response, cache_max_age=CACHE_MAX_AGE)
+        return _render_page()
+
+    if method == "POST" and path == "/search":
+        action = functools.partial(_handle_search, _read_form(environ))
+        _start_html(start_response)
+        return _render_page(action=action)
+
+    if method == "POST" and path == "/add-autosok":
+        outcome = _handle_add_autosok(_read_form(environ))
+        _start_html(start_response)
+        return _render_page(outcome)
+
+    if method not in {"GET", "POST"}:
+        return _error_page(start_response, HTTPStatus.NOT_IMPLEMENTED, "Metoden støttes ikke")
+
+    return _error_page(start_response, HTTPStatus.NOT_FOUND, "Fant ikke siden")
+
 
-    def _send_html(self, html: str) -> None:
-        data = html.encode("utf-8")
-        self.send_response(HTTPStatus.OK)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        self.send_header("Content-Length", str(len(data)))
-        self.end_headers()
-        self.wfile.write(data)
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
 
 
 def main() -> None:
-    ensure_db()
-    server = ThreadingHTTPServer((HOST, PORT), MediaMonitorHandler)
+    _ensure_db_once()
+    server = make_server(HOST, PORT, app, server_class=ThreadingWSGIServer)
     print(f"Webgrensesnitt startet på http://{HOST}:{PORT}")
     server.serve_forever()
 